@@ -1,19 +1,21 @@
 import copy
-import datetime, hashlib, json, logging, multiprocessing.pool, os, re, threading, time, zipfile
+import datetime, hashlib, json, logging, logging.handlers, multiprocessing, multiprocessing.pool, os, re, threading, time, zipfile
 from typing import Dict, List, Optional, Union
 
 import GlobalConfig
 from APIScraping.ExternalLinksHandler import ExternalLinksHandler
 from OCR import ImageParser
 from output.StoryParser import StoryParser
-from util import IdentifierParser, Language, LorcanaSymbols
+from util import IdentifierParser, JsonUtil, Language, LorcanaSymbols, Translations
 
 
 _logger = logging.getLogger("LorcanaJSON")
 FORMAT_VERSION = "2.1.0"
 _CARD_CODE_LOOKUP = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
 _KEYWORD_REGEX = re.compile(r"(?:^|\n)([A-ZÀ][^.]+)(?= \()")
-# The card parser is run in threads, and each thread needs to initialize its own ImageParser (otherwise weird errors happen in Tesseract)
+# Replaces the unicode characters used in the card info texts with their simple equivalents in a single pass
+_INFO_TEXT_TRANSLATION = str.maketrans({"’": "'", "–": "-", "“": "\"", "”": "\""})
+# The card parser is run in threads or processes, and each worker needs to initialize its own ImageParser (otherwise weird errors happen in Tesseract)
 # Store each initialized ImageParser in its own thread storage
 _threadingLocalStorage = threading.local()
 _threadingLocalStorage.imageParser: ImageParser.ImageParser = None
@@ -297,6 +299,28 @@ def _createCardIdentifier(card: Dict) -> str:
 	# Input card
 	return f"'{card['name']} - {card.get('subtitle', None)}' (ID {card['culture_invariant_id']})"
 
+def _initParseWorker(language: Language.Language = None, tesseractPath: str = None, logQueue: multiprocessing.Queue = None, logLevel: int = logging.NOTSET):
+	"""
+	Initialize a card parsing thread or process, by creating the objects each worker needs its own instance of
+	:param language: The language to parse. Only needed when the worker is a separate process, since it then doesn't share the main process's global config
+	:param tesseractPath: The path to the Tesseract models. Only needed when the worker is a separate process, for the same reason as 'language'
+	:param logQueue: The queue to send log records to, so the main process can write them. Only needed when the worker is a separate process
+	:param logLevel: The level to log at. Only needed when the worker is a separate process, for the same reason as 'logQueue'
+	"""
+	if language:
+		GlobalConfig.language = language
+		GlobalConfig.translation = Translations.getForLanguage(language)
+		GlobalConfig.tesseractPath = tesseractPath
+	if logQueue:
+		# Spawned processes don't have any logging set up, and forked processes would write to the log file independently of the main process, overwriting each other's messages
+		# So replace whatever handlers exist with one that sends the log records to the main process, which writes them to the console and the log file
+		for handler in _logger.handlers[:]:
+			_logger.removeHandler(handler)
+		_logger.addHandler(logging.handlers.QueueHandler(logQueue))
+		_logger.setLevel(logLevel)
+	_threadingLocalStorage.imageParser = ImageParser.ImageParser()
+	_threadingLocalStorage.externalIdsHandler = ExternalLinksHandler()
+
 def createOutputFiles(onlyParseIds: Union[None, List[int]] = None, shouldShowImages: bool = False) -> None:
 	startTime = time.perf_counter()
 	imageFolder = os.path.join("downloads", "images", GlobalConfig.language.code)
@@ -308,23 +332,19 @@ def createOutputFiles(onlyParseIds: Union[None, List[int]] = None, shouldShowIma
 	with open(cardCatalogPath, "r", encoding="utf-8") as inputFile:
 		inputData = json.load(inputFile)
 
-	with open(os.path.join("output", "outputDataCorrections.json"), "r", encoding="utf-8") as correctionsFile:
-		cardDataCorrections: Dict[int, Dict[str, List[str, str]]] = {int(k, 10): v for k, v in json.load(correctionsFile).items()}
+	cardDataCorrections: Dict[int, Dict[str, List[str, str]]] = JsonUtil.loadJsonWithNumberKeys(os.path.join("output", "outputDataCorrections.json"))
 	correctionsFilePath = os.path.join("output", f"outputDataCorrections_{GlobalConfig.language.code}.json")
 	if os.path.isfile(correctionsFilePath):
-		with open(correctionsFilePath, "r", encoding="utf-8") as correctionsFile:
-			# Convert all the ID keys to numbers as we load
-			for cardId, corrections in json.load(correctionsFile).items():
-				cardId = int(cardId, 10)
-				if cardId in cardDataCorrections:
-					# Merge the language-specific corrections with the global corrections
-					for fieldCorrectionName, fieldCorrection in corrections.items():
-						if fieldCorrectionName in cardDataCorrections[cardId]:
-							cardDataCorrections[cardId][fieldCorrectionName].extend(fieldCorrection)
-						else:
-							cardDataCorrections[cardId][fieldCorrectionName] = fieldCorrection
-				else:
-					cardDataCorrections[cardId] = corrections
+		for cardId, corrections in JsonUtil.loadJsonWithNumberKeys(correctionsFilePath).items():
+			if cardId in cardDataCorrections:
+				# Merge the language-specific corrections with the global corrections
+				for fieldCorrectionName, fieldCorrection in corrections.items():
+					if fieldCorrectionName in cardDataCorrections[cardId]:
+						cardDataCorrections[cardId][fieldCorrectionName].extend(fieldCorrection)
+					else:
+						cardDataCorrections[cardId][fieldCorrectionName] = fieldCorrection
+			else:
+				cardDataCorrections[cardId] = corrections
 	else:
 		_logger.warning(f"No corrections file exists for language '{GlobalConfig.language.code}', so no language-specific corrections will be done. This doesn't break anything, but results might not be perfect")
 
@@ -390,16 +410,17 @@ def createOutputFiles(onlyParseIds: Union[None, List[int]] = None, shouldShowIma
 
 	historicDataFilePath = os.path.join("output", f"historicData_{GlobalConfig.language.code}.json")
 	if os.path.isfile(historicDataFilePath):
-		with open(historicDataFilePath, "r", encoding="utf-8") as historicDataFile:
-			historicData = {int(k, 10): v for k, v in json.load(historicDataFile).items()}
+		historicData = JsonUtil.loadJsonWithNumberKeys(historicDataFilePath)
 	else:
 		historicData = {}
 
 	# Get the cards we don't have to parse (if any) from the previous generated file
 	fullCardList = []
-	cardIdsStored = []
+	cardIdsStored = set()
 	outputFolder = os.path.join("output", "generated", GlobalConfig.language.code)
 	if onlyParseIds:
+		# The ID list gets checked for every card, so make it a set for quick lookups
+		onlyParseIds = set(onlyParseIds)
 		# Load the previous generated file to get the card data for cards that didn't change, instead of generating all cards
 		outputFilePath = os.path.join(outputFolder, "allCards.json")
 		if os.path.isfile(outputFilePath):
@@ -412,7 +433,7 @@ def createOutputFiles(onlyParseIds: Union[None, List[int]] = None, shouldShowIma
 						card = previousCardData["cards"].pop()
 						if card["id"] not in onlyParseIds:
 							fullCardList.append(card)
-							cardIdsStored.append(card["id"])
+							cardIdsStored.add(card["id"])
 							# Remove the card from the corrections list, so we can still check if the corrections got applied properly
 							cardDataCorrections.pop(card["id"], None)
 							historicData.pop(card["id"], None)
@@ -420,14 +441,20 @@ def createOutputFiles(onlyParseIds: Union[None, List[int]] = None, shouldShowIma
 		else:
 			_logger.warning("ID list provided but previously generated file doesn't exist. Generating all card data")
 
-	def initThread():
-		_threadingLocalStorage.imageParser = ImageParser.ImageParser()
-		_threadingLocalStorage.externalIdsHandler = ExternalLinksHandler()
-
 	# Parse the cards we need to parse
 	languageCodeToCheck = GlobalConfig.language.code.upper()
 	cardToStoryParser = StoryParser()
-	with multiprocessing.pool.ThreadPool(GlobalConfig.threadCount, initializer=initThread) as pool:
+	logListener = None
+	if GlobalConfig.useProcesses:
+		# Separate processes aren't limited by the GIL, but they also don't share our memory, so the workers need to know the global config values
+		# They also send their log records here, so only this process writes to the log file
+		logQueue = multiprocessing.Queue()
+		logListener = logging.handlers.QueueListener(logQueue, *_logger.handlers, respect_handler_level=True)
+		logListener.start()
+		pool = multiprocessing.Pool(GlobalConfig.threadCount, initializer=_initParseWorker, initargs=(GlobalConfig.language, GlobalConfig.tesseractPath, logQueue, _logger.getEffectiveLevel()))
+	else:
+		pool = multiprocessing.pool.ThreadPool(GlobalConfig.threadCount, initializer=_initParseWorker)
+	with pool:
 		results = []
 		for cardType, inputCardlist in inputData["cards"].items():
 			cardTypeText = cardType[:-1].title()  # 'cardType' is plural ('characters', 'items', etc), make it singular
@@ -446,7 +473,7 @@ def createOutputFiles(onlyParseIds: Union[None, List[int]] = None, shouldShowIma
 				try:
 					results.append(pool.apply_async(_parseSingleCard, (inputCard, cardTypeText, imageFolder, enchantedNonEnchantedIds.get(cardId, None), promoNonPromoIds.get(cardId, None), variantsDeckBuildingIds.get(inputCard["deck_building_id"]),
 												  cardDataCorrections.pop(cardId, None), cardToStoryParser, False, historicData.get(cardId, None), shouldShowImages)))
-					cardIdsStored.append(cardId)
+					cardIdsStored.add(cardId)
 				except Exception as e:
 					_logger.error(f"Exception {type(e)} occured while parsing card ID {inputCard['culture_invariant_id']}")
 					raise e
@@ -466,6 +493,9 @@ def createOutputFiles(onlyParseIds: Union[None, List[int]] = None, shouldShowIma
 															   cardDataCorrections.pop(cardId, None), cardToStoryParser, True, historicData.get(cardId, None), shouldShowImages)))
 		pool.close()
 		pool.join()
+	if logListener:
+		# Stopping the listener handles any log records that are still in the queue
+		logListener.stop()
 	for result in results:
 		outputCard = result.get()
 		fullCardList.append(outputCard)
@@ -819,7 +849,7 @@ def _parseSingleCard(inputCard: Dict, cardType: str, imageFolder: str, enchanted
 			# The text has multiple \r\n's as newlines, reduce that to just a single \n
 			infoText: str = infoEntry["body"].rstrip().replace("\r", "").replace("\n\n", "\n").replace("\t", " ")
 			# The text uses unicode characters in some places, replace those with their simple equivalents
-			infoText = infoText.replace("’", "'").replace("–", "-").replace("“", "\"").replace("”", "\"")
+			infoText = infoText.translate(_INFO_TEXT_TRANSLATION)
 			# Sometimes they write cardnames as "basename- subtitle", add the space before the dash back in
 			infoText = re.sub(r"(\w)- ", r"\1 - ", infoText)
 			# The text uses {I} for ink and {S} for strength, replace those with our symbols
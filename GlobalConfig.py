@@ -4,3 +4,4 @@ language: Language.Language = None
 translation: Translations.Translation = None
 tesseractPath: str = None
 threadCount: int = 1
+useProcesses: bool = False
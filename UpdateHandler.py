@@ -1,7 +1,7 @@
 import datetime, hashlib, json, logging, os, random
 from typing import Any, Dict, List, Tuple
 
-import DataFilesGenerator, GlobalConfig
+import GlobalConfig
 from APIScraping import RavensburgerApiHandler
 from util import DownloadUtil
 
@@ -129,16 +129,13 @@ def checkForNewCardData(newCardCatalog: Dict = None, fieldsToIgnore: List[str] =
 		setNumberToCheck = highestSetNumber + 1
 	unlistedCards = []
 	if setNumberToCheck > -1:
-		for cardNumberToCheck in random.sample(range(1, 205), 3):
-			hashedCardNumberToCheck = hashlib.sha1(bytes(str(cardNumberToCheck), encoding="utf-8")).hexdigest()
-			urlToCheck = f"https://api.lorcana.ravensburger.com/images/en/expansions/{setNumberToCheck}/cards/1468x2048/{hashedCardNumberToCheck}.jpg"
-			try:
-				DownloadUtil.retrieveFromUrl(urlToCheck, maxAttempts=3)
-			except DownloadUtil.DownloadException:
-				# Download failed, image doesn't exist
-				pass
-			else:
-				# Download succeeded, store it
+		cardNumbersToCheck = random.sample(range(1, 205), 3)
+		urlsToCheck = [f"https://api.lorcana.ravensburger.com/images/en/expansions/{setNumberToCheck}/cards/1468x2048/{hashlib.sha1(bytes(str(cardNumberToCheck), encoding='utf-8')).hexdigest()}.jpg"
+					   for cardNumberToCheck in cardNumbersToCheck]
+		# Check all the URLs at the same time, since most of the time is spent waiting for the server
+		for cardNumberToCheck, urlToCheck, response in zip(cardNumbersToCheck, urlsToCheck, DownloadUtil.retrieveFromUrls(urlsToCheck, maxAttempts=3)):
+			# If the download failed, the image doesn't exist. If it succeeded, store it
+			if response is not None:
 				unlistedCards.append((setNumberToCheck, cardNumberToCheck, urlToCheck))
 
 	return (addedCards, cardChanges, possibleImageChanges, unlistedCards)
@@ -150,6 +147,8 @@ def createOutputIfNeeded(onlyCreateOnNewCards: bool, cardFieldsToIgnore: List[st
 		_logger.info("No catalog updates, not running output generator")
 		return
 	_logger.info(f"Found {len(addedCards):,} new cards, {len(cardChanges):,} changed cards, and {len(possibleImageChanges):,} possible image changes")
+	# Only import the generator when it's needed, since it imports the slow-to-load OCR modules, which just checking for updates doesn't need
+	import DataFilesGenerator
 	idsToParse = [entry[0] for entry in addedCards]
 	idsToParse.extend([entry[0] for entry in cardChanges])
 	# Not all possible image changes are actual changes, update only the changed images
@@ -164,6 +163,7 @@ def createOutputIfNeeded(onlyCreateOnNewCards: bool, cardFieldsToIgnore: List[st
 def createChangelog(addedCards: List[Tuple[int, str]], cardChanges, subVersion: str = "1"):
 	if not addedCards and not cardChanges:
 		return
+	import DataFilesGenerator
 
 	def createCardDescriptor(addedOrChangedCard) -> str:
 		return f"{addedOrChangedCard[1]} (ID {addedOrChangedCard[0]})"
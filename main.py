@@ -1,11 +1,10 @@
-import argparse, datetime, json, logging, logging.handlers, os, re, sys, time
+import argparse, collections, datetime, json, logging, logging.handlers, os, re, sys, time
 
-import DataFilesGenerator, GlobalConfig, UpdateHandler
-from APIScraping import RavensburgerApiHandler
-from APIScraping.ExternalLinksHandler import ExternalLinksHandler
-from OCR.ImageParser import ImageParser
-from output import Verifier
+import GlobalConfig
 from util import Language, Translations
+# The modules needed for the actions are imported when an action needs them, since some of them (especially the OCR ones) are slow to import
+
+_CARD_ID_RANGE_REGEX = re.compile(r"(\d+)-(\d+)$")
 
 
 def _infoOrPrint(logger: logging.Logger, message: str):
@@ -32,6 +31,8 @@ if __name__ == '__main__':
 															 "For other actions, this field is ignored")
 	argumentParser.add_argument("--ignoreFields", nargs="*", help="Specify one or more card fields to ignore when checking for updates. Only used with the 'check' action", default=None)
 	argumentParser.add_argument("--show", action="store_true", dest="shouldShowSubimages", help="If added, the program shows all the subimages used during parsing. It stops processing until the displayed images are closed, so this is a slow option")
+	argumentParser.add_argument("--processes", action="store_true", dest="shouldUseProcesses", help="If added, card images are parsed in separate processes instead of in threads. This isn't limited by Python's GIL, so it's faster on machines with many cores, but it uses more memory. "
+																								  "For the 'verify' action, this verifies the cards in multiple processes. The '--threads' argument then sets the number of processes")
 	argumentParser.add_argument("--threads", type=int, help="Specify how many threads should be used when executing multithreaded tasks. Specify a negative amount to use the maximum number of threads available minus the provided amount. "
 															"Leave empty to have the amount be determined automatically")
 	parsedArguments = argumentParser.parse_args()
@@ -66,12 +67,19 @@ if __name__ == '__main__':
 	if not os.path.isdir("logs"):
 		os.mkdir("logs")
 	logfilePath = os.path.join("logs", "LorcanaJSON.log")
-	loggingFileHandler = logging.handlers.RotatingFileHandler(logfilePath, mode="w", backupCount=10, encoding="utf-8", delay=True)
+	# The rollover moves an existing log file out of the way, so appending still starts a new file. Appending makes sure that the file doesn't get truncated if it's (re)opened later,
+	#  which can happen because the file only gets opened when the first buffered messages get written, or in worker processes that inherited this handler
+	loggingFileHandler = logging.handlers.RotatingFileHandler(logfilePath, mode="a", backupCount=10, encoding="utf-8", delay=True)
 	loggingFileHandler.setLevel(logging.DEBUG)
 	loggingFileHandler.setFormatter(loggingFormatter)
 	if os.path.isfile(logfilePath):
 		loggingFileHandler.doRollover()
-	logger.addHandler(loggingFileHandler)
+	# Writing each message to the file separately is slow when there are a lot of debug messages, so collect them and write them in bulk
+	# Errors get written immediately, and the logging module flushes the remaining messages when the program exits
+	# Worker processes send their log records to this process (see DataFilesGenerator._initParseWorker), so their messages end up in this buffer too
+	loggingMemoryHandler = logging.handlers.MemoryHandler(1024, flushLevel=logging.ERROR, target=loggingFileHandler)
+	loggingMemoryHandler.setLevel(logging.DEBUG)
+	logger.addHandler(loggingMemoryHandler)
 
 	#Also print everything to the console
 	loggingStreamHandler = logging.StreamHandler(sys.stdout)
@@ -87,32 +95,34 @@ if __name__ == '__main__':
 
 	cardIds = None
 	if parsedArguments.cardIds:
-		cardIds = []
+		# Use a dictionary as an ordered set, so adding and removing IDs is fast even with large ID ranges, while keeping the order in which they were specified
+		cardIdsDict = {}
 		for inputCardId in parsedArguments.cardIds:
 			if "-" in inputCardId:
 				# This is either a negative number or a range
 				if inputCardId.startswith("-"):
 					# Negative number, remove the ID from the to-parse list, if it's there
-					cardIdToRemove = int(inputCardId, 10) * -1
-					if cardIdToRemove in cardIds:
-						cardIds.remove(cardIdToRemove)
+					cardIdToRemove = int(inputCardId) * -1
+					if cardIdToRemove in cardIdsDict:
+						del cardIdsDict[cardIdToRemove]
 					else:
 						logger.warning(f"Asked to remove card ID {cardIdToRemove} from parsing, but it already wasn't in the parse list. Verify the '--cardIds' parameter list")
 				else:
 					# Range, add all the IDs in the range
-					cardIdRangeMatch = re.match(r"(\d+)-(\d+)", inputCardId)
+					cardIdRangeMatch = _CARD_ID_RANGE_REGEX.match(inputCardId)
 					if cardIdRangeMatch:
-						lowerBound = int(cardIdRangeMatch.group(1), 10)
-						upperBound = int(cardIdRangeMatch.group(2), 10)
-						cardIds.extend(list(range(lowerBound, upperBound + 1)))
+						lowerBound = int(cardIdRangeMatch.group(1))
+						upperBound = int(cardIdRangeMatch.group(2))
+						cardIdsDict.update(dict.fromkeys(range(lowerBound, upperBound + 1)))
 					else:
 						raise ValueError(f"Invalid range value '{inputCardId}' in the '--cardIds' list")
 			else:
 				# Normal number, add it to the to-parse list
 				try:
-					cardIds.append(int(inputCardId, 10))
+					cardIdsDict[int(inputCardId)] = None
 				except ValueError:
 					raise ValueError(f"Invalid value '{inputCardId}' in the '--cardIds' list, should be numeric")
+		cardIds = list(cardIdsDict)
 
 	totalStartTime = time.perf_counter()
 	for language in parsedArguments.language:
@@ -120,7 +130,9 @@ if __name__ == '__main__':
 		GlobalConfig.translation = Translations.getForLanguage(GlobalConfig.language)
 		_infoOrPrint(logger, f"Starting action '{parsedArguments.action}' for language '{GlobalConfig.language.englishName}' at {datetime.datetime.now()}")
 
-		if parsedArguments.action in ("parse", "show", "update"):
+		# The verifier only uses multiple workers when it runs in separate processes, so only determine the worker count for it in that case
+		if parsedArguments.action in ("parse", "show", "update") or (parsedArguments.action == "verify" and parsedArguments.shouldUseProcesses):
+			GlobalConfig.useProcesses = parsedArguments.shouldUseProcesses
 			if parsedArguments.action == "show" or parsedArguments.shouldShowSubimages:
 				# If we need to show images, only use one thread, since with multithreading it freezes, and showing images of multiple cards at the same time would get confusing
 				GlobalConfig.threadCount = 1
@@ -140,28 +152,27 @@ if __name__ == '__main__':
 				else:
 					logger.info(f"Using thread count {GlobalConfig.threadCount} from {threadSource}")
 			else:
-				# Only use half the available cores for threads, because we're also IO- and GIL-bound, so more threads would just slow things down
-				GlobalConfig.threadCount = max(1, os.cpu_count() // 2)
+				if GlobalConfig.useProcesses:
+					# Processes aren't GIL-bound, so we can use all the available cores
+					GlobalConfig.threadCount = os.cpu_count()
+				else:
+					# Only use half the available cores for threads, because we're also IO- and GIL-bound, so more threads would just slow things down
+					GlobalConfig.threadCount = max(1, os.cpu_count() // 2)
 				if cardIds and len(cardIds) < GlobalConfig.threadCount:
 					# No sense using more threads than we have images to process
 					GlobalConfig.threadCount = len(cardIds)
 					logger.info(f"Using thread count of {GlobalConfig.threadCount} since that's how many cards need to be parsed")
 				else:
-					logger.info(f"Using half the available threads, setting thread count to {GlobalConfig.threadCount:,}")
+					logger.info(f"Using {'all' if GlobalConfig.useProcesses else 'half'} the available threads, setting thread count to {GlobalConfig.threadCount:,}")
 
 		startTime = time.perf_counter()
 		if parsedArguments.action == "check":
+			import UpdateHandler
 			addedCards, cardChanges, possibleImageChanges, unlistedCards = UpdateHandler.checkForNewCardData(fieldsToIgnore=parsedArguments.ignoreFields)
 			print(f"{len(addedCards):,} added cards: {addedCards}")
 			# Count which fields changed
-			fieldsChanged = {}
-			for cardChange in cardChanges:
-				fieldChanged = cardChange[2]
-				if fieldChanged not in fieldsChanged:
-					fieldsChanged[fieldChanged] = 1
-				else:
-					fieldsChanged[fieldChanged] += 1
-			print(f"{len(cardChanges):,} changes {fieldsChanged}:")
+			fieldsChanged = collections.Counter(cardChange[2] for cardChange in cardChanges)
+			print(f"{len(cardChanges):,} changes {dict(fieldsChanged.most_common())}:")
 			for cardChange in cardChanges:
 				print(cardChange)
 			print(f"{len(possibleImageChanges):,} possible image changes:")
@@ -169,8 +180,11 @@ if __name__ == '__main__':
 				print(possibleImageChange)
 			print(f"{len(unlistedCards)} unlisted cards found: {unlistedCards}")
 		elif parsedArguments.action == "update":
+			import UpdateHandler
 			UpdateHandler.createOutputIfNeeded(False, cardFieldsToIgnore=parsedArguments.ignoreFields, shouldShowImages=parsedArguments.shouldShowSubimages)
 		elif parsedArguments.action == "download":
+			import UpdateHandler
+			from APIScraping import RavensburgerApiHandler
 			# Make sure we download from an up-to-date card catalog
 			cardCatalog = RavensburgerApiHandler.retrieveCardCatalog()
 			addedCards, changedCards, possibleImageChanges, unlistedCards = UpdateHandler.checkForNewCardData(cardCatalog, fieldsToIgnore=parsedArguments.ignoreFields)
@@ -184,13 +198,16 @@ if __name__ == '__main__':
 			if not config.get("cardTraderToken", None):
 				print("ERROR: Missing Card Trader API token in config file")
 			else:
+				from APIScraping.ExternalLinksHandler import ExternalLinksHandler
 				ExternalLinksHandler.updateCardshopData(config["cardTraderToken"])
 		elif parsedArguments.action == "parse":
+			import DataFilesGenerator
 			DataFilesGenerator.createOutputFiles(cardIds, shouldShowImages=parsedArguments.shouldShowSubimages)
 		elif parsedArguments.action == "show":
 			if not cardIds:
 				print("ERROR: Please provide one or more card IDs to show with the '--cardIds' argument")
 				sys.exit(-3)
+			from OCR.ImageParser import ImageParser
 			baseImagePath = os.path.join("downloads", "images", GlobalConfig.language.code)
 			baseExternalImagePath = os.path.join(baseImagePath, "external")
 			for cardId in cardIds:
@@ -216,6 +233,7 @@ if __name__ == '__main__':
 						print(f"{fieldName}: {fieldResult.text!r}")
 				print("")
 		elif parsedArguments.action == "verify":
+			from output import Verifier
 			Verifier.compareInputToOutput(cardIds)
 		else:
 			print(f"Unknown action '{parsedArguments.action}', please (re)read the help or the readme")
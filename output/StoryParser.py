@@ -1,20 +1,81 @@
-import json, logging, os, re, time
-from typing import Dict, Optional
+import logging, os, pickle, re, threading, time
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import GlobalConfig
+from util import JsonUtil
 
 
 _logger = logging.getLogger("LorcanaJSON")
+_CACHE_VERSION = 1  # Increase this when the format of the cached data changes, so old cache files don't get used
+
+def _getFileSignature(filePath: str) -> Tuple[int, int]:
+	"""
+	Get a signature that changes when the file changes, without having to read the whole file
+	:param filePath: The path to the file to get the signature of
+	:return: A tuple with the file's modification time in nanoseconds and its size in bytes
+	"""
+	fileStats = os.stat(filePath)
+	return (fileStats.st_mtime_ns, fileStats.st_size)
 
 def _createCardIdentifier(card, cardId):
 	name = card.get("name", card.get("baseName", "[[unknown]]"))
 	return f"'{name}' (ID {cardId})"
 
+def _createAlternationRegex(strings: Iterable[str]) -> Optional[re.Pattern]:
+	"""
+	Create a single regex that matches any of the provided strings as a whole word
+	:param strings: The strings the regex should match
+	:return: The compiled regex, with the matched string in the first group, or None if no strings were provided
+	"""
+	if not strings:
+		return None
+	# Keep the strings in their listing order, so when multiple strings match at the same position, the one listed first gets matched, since alternatives are tried from left to right
+	# The lookahead makes sure matches that overlap with an earlier match still get found
+	return re.compile(r"\b(?=(" + "|".join(re.escape(string) for string in strings) + r")\b)")
+
+def _findFirstListedMatch(card: Dict, alternationRegex: Optional[re.Pattern], stringOrder: Dict[str, int]) -> Optional[Tuple[str, str]]:
+	"""
+	Find which of the strings matched by the provided regex occur in the card's text fields, and return the one that's listed first
+	:param card: The card to check the fields of
+	:param alternationRegex: A regex created by '_createAlternationRegex'
+	:param stringOrder: A dictionary with for each string matched by the regex its listing order
+	:return: A tuple with the first-listed matched string and the name of the first field it was found in, or None if none of the strings occur in the card
+	"""
+	if not alternationRegex:
+		return None
+	firstMatch: Optional[Tuple[str, str]] = None
+	for fieldName in ("flavor_text", "flavorText", "rules_text", "fullText", "name", "baseName", "subtitle"):
+		if fieldName not in card:
+			continue
+		for match in alternationRegex.finditer(card[fieldName]):
+			matchedString = match.group(1)
+			if not firstMatch or stringOrder[matchedString] < stringOrder[firstMatch[0]]:
+				firstMatch = (matchedString, fieldName)
+	return firstMatch
+
 class StoryParser:
 	def __init__(self):
 		startTime = time.perf_counter()
-		with open(os.path.join("output", "fromStories.json"), "r", encoding="utf-8") as fromStoriesFile:
-			fromStories = json.load(fromStoriesFile)
+		fromStoriesPath = os.path.join("output", "fromStories.json")
+		# Use the English cardstore regardless of the set language, since that's what the stories file is based on
+		self._cardStorePath = os.path.join("downloads", "json", "carddata.en.json")
+		if not os.path.isfile(self._cardStorePath):
+			raise FileNotFoundError("The English carddata file does not exist, please run the 'download' action for English first")
+		# Matching all the cards in the cardstore to a story takes a while, and isn't needed if the cards we need to match are directly listed in the stories file
+		# So only do that when it's first needed. Since card parsing is multithreaded, make sure only one thread does the matching
+		self._isCardstoreIndexed: bool = False
+		self._cardstoreIndexLock = threading.Lock()
+		# The story data only depends on the stories file, the English cardstore, and the language, so if none of those changed, we can use the cached data of a previous run
+		self._cacheKey = (_CACHE_VERSION, GlobalConfig.language.code, _getFileSignature(fromStoriesPath), _getFileSignature(self._cardStorePath))
+		# Keep the cache out of the 'output' folder, since that contains the data files that get published
+		self._cacheFilePath = os.path.join("cache", f"storyParserCache_{GlobalConfig.language.code}.pickle")
+		if self._loadFromCache():
+			self._isCardstoreIndexed = True
+			self._createTextMatchers()
+			_logger.debug(f"Loaded cached story data after {time.perf_counter() - startTime:.4f} seconds")
+			return
+
+		fromStories = JsonUtil.loadJson(fromStoriesPath)
 		# The fromStories file is organised by story to make it easy to write and maintain
 		# Reformat it so matching individual cards to a story is easier
 		self._cardIdToStoryName: Dict[int, str] = {}
@@ -39,57 +100,150 @@ class StoryParser:
 						elif fieldMatch in self._fieldMatchers[fieldName]:
 							raise ValueError(f"Duplicate field matcher '{fieldMatch}' in '{self._fieldMatchers[fieldName][fieldMatch]}' and '{storyName}'")
 						self._fieldMatchers[fieldName][fieldMatch] = storyName
-		# Now we can go through every card and try to match each to a story
-		# Use the English cardstore regardless of the set language, since that's what the stories file is based on
-		cardStorePath = os.path.join("downloads", "json", "carddata.en.json")
-		if not os.path.isfile(cardStorePath):
-			raise FileNotFoundError("The English carddata file does not exist, please run the 'download' action for English first")
-		with open(cardStorePath, "r", encoding="utf-8") as cardstoreFile:
-			cardstore = json.load(cardstoreFile)
-		for cardtype, cardlist in cardstore["cards"].items():
-			for card in cardlist:
+		self._createTextMatchers()
+		_logger.debug(f"Reorganized story data after {time.perf_counter() - startTime:.4f} seconds")
+
+	def __getstate__(self):
+		# When this parser gets sent to another process, make sure the cardstore is only indexed once, here, instead of in every process
+		# Locks can't be sent to other processes, so leave it out, and create a new one on the other side
+		self._ensureCardstoreIndexed()
+		state = self.__dict__.copy()
+		del state["_cardstoreIndexLock"]
+		return state
+
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		self._cardstoreIndexLock = threading.Lock()
+
+	def _ensureCardstoreIndexed(self):
+		"""
+		Go through every card in the English cardstore and try to match each to a story, so cards in other languages can be matched by their ID
+		This only gets done once, the first time it's needed, after which the result is stored in the cache file
+		"""
+		if self._isCardstoreIndexed:
+			return
+		with self._cardstoreIndexLock:
+			if self._isCardstoreIndexed:
+				# Another thread finished the indexing while we were waiting for the lock
+				return
+			startTime = time.perf_counter()
+			for card in JsonUtil.iterateCardStoreCards(self._cardStorePath):
 				cardId = card["culture_invariant_id"]
 				if cardId not in self._cardIdToStoryName:
-					storyName = self.getStoryNameForCard(card, cardId)
+					storyName = self._matchCardToStory(card, cardId)
 					if storyName:
 						self._cardIdToStoryName[cardId] = storyName
-		_logger.debug(f"Reorganized story data after {time.perf_counter() - startTime:.4f} seconds")
+			self._isCardstoreIndexed = True
+			self._saveToCache()
+			_logger.debug(f"Matched cardstore cards to stories after {time.perf_counter() - startTime:.4f} seconds")
+
+	def _createTextMatchers(self):
+		# Combine all the names and all the subtypes into a single regex each, so finding them in card texts takes one search per field instead of one per name
+		self._cardNamesRegex: Optional[re.Pattern] = _createAlternationRegex(self._cardNameToStoryName)
+		self._subtypesRegex: Optional[re.Pattern] = _createAlternationRegex(self._subtypeToStoryName)
+		# If multiple names or subtypes occur in a card, the one listed first in the stories file should be used, so store the listing order
+		self._cardNameOrder: Dict[str, int] = {name: index for index, name in enumerate(self._cardNameToStoryName)}
+		self._subtypeOrder: Dict[str, int] = {subtype: index for index, subtype in enumerate(self._subtypeToStoryName)}
+		# Also combine the field matchers into a single regex per field. Each matcher gets its own named group, so we know which one matched
+		# Field matchers match either as a regex or as literal text, so add both options to the matcher's group
+		self._fieldMatcherRegexes: Dict[str, re.Pattern] = {}
+		self._fieldMatcherStoryNames: Dict[str, List[str]] = {}
+		for fieldName, fieldData in self._fieldMatchers.items():
+			matcherGroups = [f"(?P<m{matcherIndex}>{fieldMatch}|{re.escape(fieldMatch)})" for matcherIndex, fieldMatch in enumerate(fieldData)]
+			self._fieldMatcherRegexes[fieldName] = re.compile("(?=" + "|".join(matcherGroups) + ")")
+			self._fieldMatcherStoryNames[fieldName] = list(fieldData.values())
+
+	def _loadFromCache(self) -> bool:
+		"""
+		Load the reorganized story data from the cache file, if it exists and was created from the same input files
+		:return: True if the cached data was loaded, False if the data needs to be rebuilt
+		"""
+		if not os.path.isfile(self._cacheFilePath):
+			return False
+		# The cache is only there to speed things up, so any problem with it (unreadable, corrupted, written by a newer Python version, etc) should just lead to a rebuild
+		try:
+			with open(self._cacheFilePath, "rb") as cacheFile:
+				cachedData = pickle.load(cacheFile)
+			if cachedData.get("key", None) != self._cacheKey:
+				_logger.debug("Story cache is outdated, rebuilding story data")
+				return False
+			cachedStoryData = (cachedData["cardIdToStoryName"], cachedData["cardNameToStoryName"], cachedData["subtypeToStoryName"], cachedData["fieldMatchers"])
+		except Exception as e:
+			_logger.warning(f"Unable to load story cache file '{self._cacheFilePath}', rebuilding story data: {e}")
+			return False
+		self._cardIdToStoryName, self._cardNameToStoryName, self._subtypeToStoryName, self._fieldMatchers = cachedStoryData
+		return True
+
+	def _saveToCache(self):
+		"""
+		Save the reorganized story data to the cache file, so the next run can skip rebuilding it
+		The cache is only there to speed things up, so if it can't be written, story parsing continues normally
+		"""
+		cachedData = {
+			"key": self._cacheKey,
+			"cardIdToStoryName": self._cardIdToStoryName,
+			"cardNameToStoryName": self._cardNameToStoryName,
+			"subtypeToStoryName": self._subtypeToStoryName,
+			"fieldMatchers": self._fieldMatchers
+		}
+		try:
+			os.makedirs(os.path.dirname(self._cacheFilePath), exist_ok=True)
+			with open(self._cacheFilePath, "wb") as cacheFile:
+				pickle.dump(cachedData, cacheFile)
+		except OSError as e:
+			_logger.warning(f"Unable to save story cache file '{self._cacheFilePath}', story data will be rebuilt next run: {e}")
 
 	def getStoryNameForCard(self, card, cardId: int) -> Optional[str]:
-		if cardId in self._cardIdToStoryName:
+		storyName = self._cardIdToStoryName.get(cardId, None)
+		if storyName:
 			# Card is already stored, by directly referencing its ID in the 'fromStories' file, so we don't need to do anything anymore
-			return self._cardIdToStoryName[cardId]
+			return storyName
+		# Cards in other languages don't have the English names and texts the stories file is based on, so match them by their ID with the English cards
+		self._ensureCardstoreIndexed()
+		return self._matchCardToStory(card, cardId)
+
+	def _matchCardToStory(self, card, cardId: int) -> Optional[str]:
+		storyName = self._cardIdToStoryName.get(cardId, None)
+		if storyName:
+			return storyName
 		# Check the subtypes list first, those are unique enough that they can often take precedence over names (f.i. Musketeer)
-		if "subtypes" in card:
-			for subtype in card["subtypes"]:
-				if subtype in self._subtypeToStoryName:
-					return self._subtypeToStoryName[subtype]
+		for subtype in card.get("subtypes", ()):
+			storyName = self._subtypeToStoryName.get(subtype, None)
+			if storyName:
+				return storyName
 		for fieldName in ("name", "baseName", "subtitle", "fullName"):
-			if fieldName in card and card[fieldName] in self._cardNameToStoryName:
-				return self._cardNameToStoryName[card[fieldName]]
+			storyName = self._cardNameToStoryName.get(card.get(fieldName, None), None)
+			if storyName:
+				return storyName
 		# Go through each field matcher to see if it matches anything
 		for fieldName, fieldData in self._fieldMatchers.items():
 			if fieldName not in card:
 				continue
-			for fieldMatch, storyName in fieldData.items():
-				if isinstance(card[fieldName], list):
+			if isinstance(card[fieldName], list):
+				for fieldMatch, storyName in fieldData.items():
 					if fieldMatch in card[fieldName]:
 						return storyName
-				elif fieldMatch in card[fieldName] or re.search(fieldMatch, card[fieldName]):
-					return storyName
+			else:
+				# Multiple matchers could match the field, use the one listed first, like with names
+				matcherIndexes = [int(match.lastgroup[1:]) for match in self._fieldMatcherRegexes[fieldName].finditer(card[fieldName])]
+				if matcherIndexes:
+					return self._fieldMatcherStoryNames[fieldName][min(matcherIndexes)]
 		# No match, try to see if any of the names occurs in some of the card's fields
-		for name, storyName in self._cardNameToStoryName.items():
-			nameRegex = re.compile(rf"\b{name}\b")
-			for fieldName in ("flavor_text", "flavorText", "rules_text", "fullText", "name", "baseName", "subtitle"):
-				if fieldName in card and nameRegex.search(card[fieldName]):
-					_logger.debug(f"Assuming {_createCardIdentifier(card, cardId)} is in story '{storyName}' based on '{name}' in the field '{fieldName}': {card[fieldName]!r}")
-					return storyName
+		nameMatch = _findFirstListedMatch(card, self._cardNamesRegex, self._cardNameOrder)
+		if nameMatch:
+			name, fieldName = nameMatch
+			storyName = self._cardNameToStoryName[name]
+			# Building this log message is relatively slow and happens for a lot of cards, so only do it when it'll actually get logged
+			if _logger.isEnabledFor(logging.DEBUG):
+				_logger.debug(f"Assuming {_createCardIdentifier(card, cardId)} is in story '{storyName}' based on '{name}' in the field '{fieldName}': {card[fieldName]!r}")
+			return storyName
 		# As a last resort, check if one of the subtypes is listed somewhere in the card
-		for subtype, storyName in self._subtypeToStoryName.items():
-			subtypeRegex = re.compile(rf"\b{subtype}\b")
-			for fieldName in ("flavor_text", "flavorText", "rules_text", "fullText", "name", "baseName", "subtitle"):
-				if fieldName in card and subtypeRegex.search(card[fieldName]):
-					_logger.debug(f"Assuming {_createCardIdentifier(card, cardId)} is in story '{storyName}' based on subtype '{subtype}' in the field '{fieldName}': {card[fieldName]!r}")
-					return storyName
+		subtypeMatch = _findFirstListedMatch(card, self._subtypesRegex, self._subtypeOrder)
+		if subtypeMatch:
+			subtype, fieldName = subtypeMatch
+			storyName = self._subtypeToStoryName[subtype]
+			if _logger.isEnabledFor(logging.DEBUG):
+				_logger.debug(f"Assuming {_createCardIdentifier(card, cardId)} is in story '{storyName}' based on subtype '{subtype}' in the field '{fieldName}': {card[fieldName]!r}")
+			return storyName
 		_logger.error(f"Unable to determine story ID of card {_createCardIdentifier(card, cardId)}")
 		return None
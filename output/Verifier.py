@@ -1,12 +1,41 @@
-import json, os, re
-from typing import Dict, List, Union
+import collections, functools, multiprocessing, operator, os, re, sys
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 import GlobalConfig
-from util import Language, LorcanaSymbols, Translations
+from util import JsonUtil, Language, LorcanaSymbols, Translations
 
 
 _subtypeSeparatorString = f" {LorcanaSymbols.SEPARATOR} "
-def compareInputToOutput(cardIdsToVerify: Union[List[int], None]):
+# Translation tables to replace or remove multiple single characters in one go, instead of with a chain of 'replace' calls
+_INPUT_RULES_TEXT_TRANSLATION = str.maketrans({"–": "-", "\\": None})
+_INPUT_FLAVOR_TEXT_TRANSLATION = str.maketrans({"\u00a0": None, "‘": "'", "’": "'", "<": None, ">": None})
+_OUTPUT_FLAVOR_TEXT_TRANSLATION = str.maketrans({"“": None, "”": None, "‘": "'", "’": "'"})
+_CONTRACTION_APOSTROPHE_REGEX = re.compile(r"(?<=\w)’(?=\w)")
+_FRENCH_PUNCTUATION_REGEX = re.compile(r"(?<=\w)([?!:])")
+# Finds both French punctuation that needs a space before it, and multiple periods that should be an ellipsis, so rules texts only need to be searched once
+_FRENCH_RULES_TEXT_PUNCTUATION_REGEX = re.compile(r"(?<=\w)([?!:])|\.{2,}")
+_MISSING_SPACE_REGEX = re.compile(r"([).])([A-Z])")
+_PERCENTAGE_NEWLINE_REGEX = re.compile(" ?% ?")
+# The symbols that should occur just as often in every language's fullText
+_FULL_TEXT_SYMBOLS = ("⟳", "⬡", "◊", "¤", "⛉", "◉", "•")
+# Finds a symbol that doesn't have whitespace (or allowed punctuation) before or after it, per symbol
+_SYMBOL_WITHOUT_WHITESPACE_REGEXES = {symbol: re.compile(f"[^ \n“]{symbol}|{symbol}[^ \n.,]") for symbol in _FULL_TEXT_SYMBOLS}
+# Newlines and the dashes around them get replaced differently, these regexes find all of them in one pass, and '_NEWLINE_REPLACEMENTS' says what to replace each match with
+_OUTPUT_RULES_TEXT_NEWLINE_REGEX = re.compile(" -\n|-\n|\n")
+_OUTPUT_FLAVOR_TEXT_NEWLINE_REGEX = re.compile("[-—]?\n")
+_NEWLINE_REPLACEMENTS = {" -\n": " - ", "-\n": "-", "—\n": "—", "\n": " "}
+# The fields that should be the same in the English output and the output of other languages. For lists, only the length gets compared
+_ENGLISH_COMPARISON_FIELDS = ('abilities', 'artistsText', 'enchantedId', 'cost', 'effects', 'fullTextSections', 'historicData', 'inkwell', 'keywordAbilities',
+							  'lore', 'moveCost', 'nonEnchantedId', 'nonPromoId', 'number', 'strength', 'subtypes', 'variant', 'variandIds', 'willPower')
+# Used to tell a missing field apart from a field that's set to None
+_MISSING_FIELD = object()
+# When verifying in multiple processes, each process gets this many cards at a time
+_CARDS_PER_VERIFICATION_BATCH = 250
+# Turns the flags of whether two characters differ into the characters used to mark that in the difference description
+_DIFFERENCE_POINTERS_TABLE = bytes.maketrans(b"\x00\x01", b" ^")
+
+def compareInputToOutput(cardIdsToVerify: Union[Iterable[int], None]):
 	inputFilePath = os.path.join("downloads", "json", f"carddata.{GlobalConfig.language.code}.json")
 	if not os.path.isfile(inputFilePath):
 		print("Input file does not exist. Please run the 'download' action for the specified language first")
@@ -16,60 +45,93 @@ def compareInputToOutput(cardIdsToVerify: Union[List[int], None]):
 		print("Output file does not exist. Please run the 'parse' action for the specified language first")
 		return
 
-	with open(inputFilePath, "r", encoding="utf-8") as inputFile:
-		inputCardStore = json.load(inputFile)
-	with open(outputFilePath, "r", encoding="utf-8") as outputFile:
-		outputCardStore = json.load(outputFile)
+	inputCardStore = JsonUtil.loadJson(inputFilePath)
+	outputCardStore = JsonUtil.loadJson(outputFilePath)
 	idToEnglishOutputCard = {}
-	englishRarities = ()
-	currentLanguageRarities = ()
 	if GlobalConfig.language != Language.ENGLISH:
 		englishOutputFilePath = os.path.join("output", "generated", Language.ENGLISH.code, "allCards.json")
 		if os.path.isfile(englishOutputFilePath):
-			with open(englishOutputFilePath, "r", encoding="utf-8") as englishOutputFile:
-				englishOutputCardStore = json.load(englishOutputFile)
-				for englishCard in englishOutputCardStore["cards"]:
-					idToEnglishOutputCard[englishCard["id"]] = englishCard
+			idToEnglishOutputCard = _loadEnglishOutputCardsById(englishOutputFilePath, os.path.getmtime(englishOutputFilePath))
 		else:
 			print("WARNING: English output file doesn't exist, skipping comparison")
-		englishRarities = (Translations.ENGLISH.COMMON, Translations.ENGLISH.UNCOMMON, Translations.ENGLISH.RARE, Translations.ENGLISH.SUPER, Translations.ENGLISH.LEGENDARY, Translations.ENGLISH.ENCHANTED, Translations.ENGLISH.SPECIAL)
-		currentTranslation = Translations.getForLanguage(GlobalConfig.language)
-		currentLanguageRarities = (currentTranslation.COMMON, currentTranslation.UNCOMMON, currentTranslation.RARE, currentTranslation.SUPER, currentTranslation.LEGENDARY, currentTranslation.ENCHANTED, currentTranslation.SPECIAL)
 
-	idToInputCard = {}
-	for cardtype, cardlist in inputCardStore["cards"].items():
-		for inputCard in cardlist:
-			idToInputCard[inputCard["culture_invariant_id"]] = inputCard
+	idToInputCard = {inputCard["culture_invariant_id"]: inputCard for inputCard in chain.from_iterable(inputCardStore["cards"].values())}
 
 	# Some of the data in the input file is wrong, which leads to false positives. Get override values here, to prevent that
 	# It's organised by language, then by card ID, then by inputCard field, where the value is a pair of strings (regex match and correction), or a new number if it's a numeric field
 	overridesFilePath = os.path.join("output", f"verifierOverrides_{GlobalConfig.language.code}.json")
 	if os.path.isfile(overridesFilePath):
-		with open(overridesFilePath, "r", encoding="utf-8") as overridesFile:
-			inputOverrides = json.load(overridesFile)
-			# Convert the keys to ints
-			inputOverrides = {int(k, 10): v for k, v in inputOverrides.items()}
-			print(f"Overrides file found, loaded {len(inputOverrides):,} input overrides")
+		inputOverrides = JsonUtil.loadJsonWithNumberKeys(overridesFilePath)
+		print(f"Overrides file found, loaded {len(inputOverrides):,} input overrides")
 	else:
 		print("No overrides file found")
 		inputOverrides = {}
 
+	outputCards = outputCardStore["cards"]
+	if cardIdsToVerify:
+		# Filter out the cards we don't need to verify in one go, so the main loop only goes through the cards that need verifying
+		cardIdsToVerify = frozenset(cardIdsToVerify)
+		outputCards = [outputCard for outputCard in outputCards if outputCard["id"] in cardIdsToVerify]
+	# Collect everything needed to verify each card, so the cards can be verified independently of each other
+	cardsToVerify: List[Tuple[Dict, Optional[Dict], Optional[Dict], Optional[Dict]]] = []
+	for outputCard in outputCards:
+		inputCard = idToInputCard.get(outputCard["id"], None)
+		englishCard = None
+		if idToEnglishOutputCard and inputCard is not None and not outputCard.get("isExternalReval", False):
+			englishCard = idToEnglishOutputCard[outputCard["id"]]
+		cardsToVerify.append((outputCard, inputCard, englishCard, inputOverrides.get(outputCard["id"], None)))
+
+	if GlobalConfig.useProcesses and GlobalConfig.threadCount > 1 and len(cardsToVerify) > _CARDS_PER_VERIFICATION_BATCH:
+		# Verifying is CPU-bound, so spread the cards over multiple processes, since those aren't limited by the GIL
+		# Sending each card to a process separately has a lot of overhead, so send them in batches
+		cardBatches = [cardsToVerify[batchStartIndex:batchStartIndex + _CARDS_PER_VERIFICATION_BATCH] for batchStartIndex in range(0, len(cardsToVerify), _CARDS_PER_VERIFICATION_BATCH)]
+		with multiprocessing.Pool(min(GlobalConfig.threadCount, len(cardBatches))) as pool:
+			results = pool.starmap(_verifyCards, [(cardBatch, GlobalConfig.language) for cardBatch in cardBatches])
+	else:
+		results = [_verifyCards(cardsToVerify, GlobalConfig.language)]
+
 	cardDifferencesCount = 0
-	for outputCard in outputCardStore["cards"]:
-		if cardIdsToVerify and outputCard["id"] not in cardIdsToVerify:
-			continue
+	messages: List[str] = []
+	for batchDifferencesCount, batchMessages in results:
+		cardDifferencesCount += batchDifferencesCount
+		messages.extend(batchMessages)
+	# There can be thousands of messages, so write them all at once instead of printing them one by one
+	messages.append(f"----------\nFound {cardDifferencesCount:,} difference{'' if cardDifferencesCount == 1 else 's'} between input and output\n")
+	sys.stdout.write("\n".join(messages))
+
+def _verifyCards(cardsToVerify: List[Tuple[Dict, Optional[Dict], Optional[Dict], Optional[Dict]]], language: Language.Language) -> Tuple[int, List[str]]:
+	"""
+	Compare the provided output cards to their input cards, and to their English output cards if provided
+	This doesn't use the global config, so it can also run in a separate process
+	:param cardsToVerify: A list of tuples, each with the output card to verify, the matching input card (or None if it doesn't exist), the matching English output card (or None if it shouldn't be compared), and the input overrides for the card (or None if there aren't any)
+	:param language: The language of the cards to verify
+	:return: A tuple with the number of differences found, and the messages describing the differences and other issues, in the order the cards were provided
+	"""
+	# These don't change during verification, so look them up once instead of for every card
+	translation = Translations.getForLanguage(language)
+	isFrench = language == Language.FRENCH
+	enchantedRarity = translation.ENCHANTED
+	specialRarity = translation.SPECIAL
+	languageName = language.englishName
+	englishRarities = (Translations.ENGLISH.COMMON, Translations.ENGLISH.UNCOMMON, Translations.ENGLISH.RARE, Translations.ENGLISH.SUPER, Translations.ENGLISH.LEGENDARY, Translations.ENGLISH.ENCHANTED, Translations.ENGLISH.SPECIAL)
+	currentLanguageRarities = (translation.COMMON, translation.UNCOMMON, translation.RARE, translation.SUPER, translation.LEGENDARY, translation.ENCHANTED, translation.SPECIAL)
+	# Rarities are compared by their index, so store those indexes per rarity name for quick lookups
+	englishRarityToIndex = {rarity: rarityIndex for rarityIndex, rarity in enumerate(englishRarities)}
+	currentLanguageRarityToIndex = {rarity: rarityIndex for rarityIndex, rarity in enumerate(currentLanguageRarities)}
+	messages: List[str] = []
+	cardDifferencesCount = 0
+	for outputCard, inputCard, englishCard, inputOverrides in cardsToVerify:
 		if outputCard.get("isExternalReval", False):
-			print(f"Skipping external reveal card '{outputCard['fullName']}' (ID {outputCard['id']})")
+			messages.append(f"Skipping external reveal card '{outputCard['fullName']}' (ID {outputCard['id']})")
 			continue
-		if outputCard["id"] not in idToInputCard:
-			print(f"WARNING: '{outputCard['fullName']}' (ID {outputCard['id']}) does not exist in the input file, skipping")
+		if inputCard is None:
+			messages.append(f"WARNING: '{outputCard['fullName']}' (ID {outputCard['id']}) does not exist in the input file, skipping")
 			continue
 		cardId = outputCard["id"]
-		inputCard = idToInputCard[cardId]
 
 		# Implement overrides
-		if cardId in inputOverrides:
-			for fieldName, correctionsTuple in inputOverrides[cardId].items():
+		if inputOverrides:
+			for fieldName, correctionsTuple in inputOverrides.items():
 				for correctionIndex in range(0, len(correctionsTuple), 2):
 					regexMatch = correctionsTuple[correctionIndex]
 					correctionText = correctionsTuple[correctionIndex+1]
@@ -77,68 +139,31 @@ def compareInputToOutput(cardIdsToVerify: Union[List[int], None]):
 						if inputCard[fieldName] == regexMatch:
 							inputCard[fieldName] = correctionText
 						else:
-							print(f"ERROR: Correction override number {regexMatch} does not match actual input card value {inputCard[fieldName]} for field '{fieldName}' in card {cardId}")
+							messages.append(f"ERROR: Correction override number {regexMatch} does not match actual input card value {inputCard[fieldName]} for field '{fieldName}' in card {cardId}")
 					else:
 						inputCard[fieldName], correctionCount = re.subn(regexMatch, correctionText, inputCard[fieldName])
 						if correctionCount == 0:
-							print(f"ERROR: Invalid correction override {regexMatch!r} for field '{fieldName}' for card ID {cardId}")
+							messages.append(f"ERROR: Invalid correction override {regexMatch!r} for field '{fieldName}' for card ID {cardId}")
 
 		# Compare rules text
-		if inputCard.get("rules_text", None) or outputCard["fullText"]:
-			if inputCard.get("rules_text", None):
-				inputRulesText = inputCard["rules_text"].replace("–", "-").replace("\\", "")
-				inputRulesText = re.sub(r"(?<=\w)’(?=\w)", "'", inputRulesText)
-				inputRulesText = inputRulesText.replace("\u00a0", " " if GlobalConfig.language == Language.FRENCH else "").replace("  ", " ")
-				inputRulesText = inputRulesText.replace(" \"", " “").replace("\" ", "” ")
-				# Sometimes there's no space between the previous ability text and the next label or ability, fix that
-				inputRulesText = re.sub(r"([).])([A-Z])", r"\1 \2", inputRulesText)
-				if GlobalConfig.language == Language.ENGLISH:
-					inputRulesText = inputRulesText.replace("teammates’ ", "teammates' ").replace("players’ ", "players' ")
-				elif GlobalConfig.language == Language.FRENCH:
-					# Exclamation marks etc. should be preceded by a space
-					inputRulesText = re.sub(r"(?<=\w)([?!:])", r" \1", inputRulesText)
-					inputRulesText = re.sub("\\.{2,}", "…", inputRulesText)
-			else:
-				inputRulesText = ""
-
-			if outputCard["fullText"]:
-				outputRulesText = outputCard["fullText"].replace(" -\n", " - ").replace("-\n", "-").replace("\n", " ")
-				# Remove all the Lorcana symbols:
-				outputRulesText = outputRulesText.replace(f"{LorcanaSymbols.EXERT},", ",")
-				outputRulesText = re.sub(fr" ?[{LorcanaSymbols.EXERT}{LorcanaSymbols.INK}{LorcanaSymbols.LORE}{LorcanaSymbols.STRENGTH}{LorcanaSymbols.WILLPOWER}{LorcanaSymbols.INKWELL}] ?", " ", outputRulesText).lstrip()
-				outputRulesText = outputRulesText.replace("  ", " ").replace(" .", ".")
-			else:
-				outputRulesText = ""
+		inputRulesText = inputCard.get("rules_text", None)
+		if inputRulesText or outputCard["fullText"]:
+			inputRulesText = _normalizeInputRulesText(inputRulesText, language) if inputRulesText else ""
+			outputRulesText = _normalizeOutputRulesText(outputCard["fullText"]) if outputCard["fullText"] else ""
 
 			if inputRulesText != outputRulesText:
 				cardDifferencesCount += 1
-				_printDifferencesDescription(outputCard, "rules text", inputRulesText, outputRulesText)
+				messages.append(_createDifferencesDescription(outputCard, "rules text", inputRulesText, outputRulesText))
 
 		# Compare flavor text
-		if inputCard.get("flavor_text", None) or "flavorText" in outputCard:
-			if "flavor_text" in inputCard and inputCard["flavor_text"] != "ERRATA":
-				inputFlavorText: str = inputCard["flavor_text"].replace("\u00a0", "").replace("‘", "'").replace("’", "'").replace("<", "").replace(">", "").rstrip()
-				# '%' seems to be a substitute for a newline character
-				inputFlavorText = re.sub(" ?% ?", " ", inputFlavorText)
-				inputFlavorText = inputFlavorText.replace("  ", " ")
-				if inputFlavorText.endswith(" ERRATA"):
-					inputFlavorText = inputFlavorText.rsplit(" ", 1)[0]
-				if GlobalConfig.language == Language.FRENCH:
-					inputFlavorText = re.sub(r"(?<=\w)([?!:])", r" \1", inputFlavorText)
-			else:
-				inputFlavorText = ""
-
-			if "flavorText" in outputCard:
-				outputFlavorText = outputCard['flavorText']
-				outputFlavorText = outputFlavorText.replace("“", "").replace("”", "").replace("‘", "'").replace("’", "'")
-				# Newlines are spaces in the input text, except after connecting dashes just before a newline
-				outputFlavorText = outputFlavorText.replace("-\n", "-").replace("—\n", "—").replace("\n", " ")
-			else:
-				outputFlavorText = ""
+		inputFlavorText: Optional[str] = inputCard.get("flavor_text", None)
+		if inputFlavorText or "flavorText" in outputCard:
+			inputFlavorText = _normalizeInputFlavorText(inputFlavorText, language) if inputFlavorText and inputFlavorText != "ERRATA" else ""
+			outputFlavorText = _normalizeOutputFlavorText(outputCard["flavorText"]) if "flavorText" in outputCard else ""
 
 			if outputFlavorText != inputFlavorText:
 				cardDifferencesCount += 1
-				_printDifferencesDescription(outputCard, "flavor text", inputFlavorText, outputFlavorText)
+				messages.append(_createDifferencesDescription(outputCard, "flavor text", inputFlavorText, outputFlavorText))
 
 		# Compare subtypes
 		if inputCard["subtypes"] or "subtypes" in outputCard:
@@ -146,19 +171,19 @@ def compareInputToOutput(cardIdsToVerify: Union[List[int], None]):
 			outputSubtypesText = _subtypeSeparatorString.join(outputCard.get("subtypes", []))
 			if inputSubtypesText != outputSubtypesText:
 				cardDifferencesCount += 1
-				_printDifferencesDescription(outputCard, "subtypes", inputSubtypesText, outputSubtypesText)
+				messages.append(_createDifferencesDescription(outputCard, "subtypes", inputSubtypesText, outputSubtypesText))
 
 		# Cards beyond the 'normal' numbering are either Enchanted or otherwise Special, check if that's stored properly
-		if outputCard["rarity"] == GlobalConfig.translation.ENCHANTED and "nonEnchantedId" not in outputCard and "nonPromoId" not in outputCard:
-			print(f"{outputCard['fullName']} (ID {outputCard['id']}) should have a non-enchanted ID or non-promo ID field, but it doesn't")
-		elif "Q" not in outputCard["setCode"] and outputCard["rarity"] == GlobalConfig.translation.SPECIAL and "nonPromoId" not in outputCard:
-			print(f"{outputCard['fullName']} (ID {outputCard['id']}) should have a non-promo ID field, but it doesn't")
+		if outputCard["rarity"] == enchantedRarity and "nonEnchantedId" not in outputCard and "nonPromoId" not in outputCard:
+			messages.append(f"{outputCard['fullName']} (ID {outputCard['id']}) should have a non-enchanted ID or non-promo ID field, but it doesn't")
+		elif "Q" not in outputCard["setCode"] and outputCard["rarity"] == specialRarity and "nonPromoId" not in outputCard:
+			messages.append(f"{outputCard['fullName']} (ID {outputCard['id']}) should have a non-promo ID field, but it doesn't")
 
 		inputIdentifier = inputCard["card_identifier"].replace(" ", f" {LorcanaSymbols.SEPARATOR} ")
 		outputIdentifier = outputCard["fullIdentifier"].lstrip("0")  # The input identifiers don't have the leading zero, so strip it here too
 		if inputIdentifier != outputIdentifier:
 			cardDifferencesCount += 1
-			_printDifferencesDescription(outputCard, "fullIdentifier", inputIdentifier, outputCard["fullIdentifier"])
+			messages.append(_createDifferencesDescription(outputCard, "fullIdentifier", inputIdentifier, outputCard["fullIdentifier"]))
 
 		# Compare basic fields
 		for inputField, outputField in (("author", "artistsText"), ("ink_cost", "cost"), ("move_cost", "moveCost"), ("quest_value", "lore"), ("strength", "strength"), ("willpower", "willpower")):
@@ -168,70 +193,177 @@ def compareInputToOutput(cardIdsToVerify: Union[List[int], None]):
 				continue
 			if inputValue != outputValue:
 				cardDifferencesCount += 1
-				_printDifferencesDescription(outputCard, outputField, str(inputValue), str(outputValue))
+				messages.append(_createDifferencesDescription(outputCard, outputField, str(inputValue), str(outputValue)))
 
 		# Check if the story is properly filled in
 		# This isn't strictly speaking a verification since it doesn't compare with anything in the input file, but it is important to know about missing stories
 		if not outputCard.get("story", None):
 			cardDifferencesCount += 1
-			print(f"WARNING: {outputCard['fullName']} (ID {outputCard['id']}) does not have a valid story set")
+			messages.append(f"WARNING: {outputCard['fullName']} (ID {outputCard['id']}) does not have a valid story set")
 
 		# If this isn't English, compare with the English results
 		# English is easier to manually verify, so this is done to prevent mistakes or oddities, like ability type mismatches between languages
-		if idToEnglishOutputCard:
-			englishCard = idToEnglishOutputCard[outputCard["id"]]
-			cardId = outputCard["id"]
-			for fieldname in ('abilities', 'artistsText', 'enchantedId', 'cost', 'effects', 'fullTextSections', 'historicData', 'inkwell', 'keywordAbilities',
-							  'lore', 'moveCost', 'nonEnchantedId', 'nonPromoId', 'number', 'strength', 'subtypes', 'variant', 'variandIds', 'willPower'):
-				if fieldname not in outputCard and fieldname not in englishCard:
+		if englishCard:
+			for fieldname in _ENGLISH_COMPARISON_FIELDS:
+				# Get each value once, instead of checking and getting the field separately for each comparison
+				outputValue = outputCard.get(fieldname, _MISSING_FIELD)
+				englishValue = englishCard.get(fieldname, _MISSING_FIELD)
+				if outputValue is _MISSING_FIELD and englishValue is _MISSING_FIELD:
 					continue
-				if fieldname in outputCard and fieldname not in englishCard:
+				if englishValue is _MISSING_FIELD:
 					cardDifferencesCount += 1
-					print(f"{cardId}: '{fieldname}' exists in {GlobalConfig.language.englishName} but not in English")
-				elif fieldname not in outputCard and fieldname in englishCard:
+					messages.append(f"{cardId}: '{fieldname}' exists in {languageName} but not in English")
+				elif outputValue is _MISSING_FIELD:
 					cardDifferencesCount += 1
-					print(f"{cardId}: '{fieldname}' doesn't exist in {GlobalConfig.language.englishName} but does in English")
-				elif isinstance(outputCard[fieldname], list):
-					if len(outputCard[fieldname]) != len(englishCard[fieldname]):
+					messages.append(f"{cardId}: '{fieldname}' doesn't exist in {languageName} but does in English")
+				elif isinstance(outputValue, list):
+					if len(outputValue) != len(englishValue):
 						cardDifferencesCount += 1
-						print(f"{cardId}: '{fieldname}' doesn't have same length in {GlobalConfig.language.englishName} and English: length is {len(outputCard[fieldname])} in {GlobalConfig.language.englishName} but {len(englishCard[fieldname])} in English")
-				elif outputCard[fieldname] != englishCard[fieldname]:
+						messages.append(f"{cardId}: '{fieldname}' doesn't have same length in {languageName} and English: length is {len(outputValue)} in {languageName} but {len(englishValue)} in English")
+				elif outputValue != englishValue:
 					cardDifferencesCount += 1
-					print(f"{cardId}: '{fieldname}' differs between {GlobalConfig.language.englishName} '{outputCard[fieldname]}' and English '{englishCard[fieldname]}'")
+					messages.append(f"{cardId}: '{fieldname}' differs between {languageName} '{outputValue}' and English '{englishValue}'")
 			if outputCard["fullText"] or englishCard["fullText"]:
-				for symbol in ("⟳", "⬡", "◊", "¤", "⛉", "◉", "•"):
-					expectedCount = englishCard["fullText"].count(symbol)
-					if GlobalConfig.language == Language.FRENCH and symbol == "¤" and "Soutien" in outputCard["fullText"]:
+				# Count all the characters in one go, instead of going through the whole text for each symbol
+				outputCharacterCounts = collections.Counter(outputCard["fullText"])
+				englishCharacterCounts = collections.Counter(englishCard["fullText"])
+				for symbol in _FULL_TEXT_SYMBOLS:
+					expectedCount = englishCharacterCounts[symbol]
+					if isFrench and symbol == "¤" and "Soutien" in outputCard["fullText"]:
 						# While most languages use two strength symbols in the Support reminder text, French uses just one. To prevent false positives and negatives, adjust our expectations
 						expectedCount -= 1
-					if outputCard["fullText"].count(symbol) != expectedCount:
+					if outputCharacterCounts[symbol] != expectedCount:
 						cardDifferencesCount += 1
-						print(f"{cardId}: Symbol '{symbol}' occurs {outputCard['fullText'].count(symbol)} times in {GlobalConfig.language.englishName} fullText but {expectedCount} was expected based on English")
+						messages.append(f"{cardId}: Symbol '{symbol}' occurs {outputCharacterCounts[symbol]} times in {languageName} fullText but {expectedCount} was expected based on English")
 					# Check if the symbols have whitespace around them, since in previous verification steps we've ignored the symbols
-					if re.search(f"[^ \n“]{symbol}", outputCard["fullText"]) or re.search(f"{symbol}[^ \n.,]", outputCard["fullText"]):
+					# Most symbols don't occur in most texts, so only search the text if the symbol is actually in there
+					if outputCharacterCounts[symbol] and _SYMBOL_WITHOUT_WHITESPACE_REGEXES[symbol].search(outputCard["fullText"]):
 						cardDifferencesCount += 1
-						print(f"{cardId}: Symbol '{symbol}' doesn't have whitespace around it")
+						messages.append(f"{cardId}: Symbol '{symbol}' doesn't have whitespace around it")
 			if "abilities" in outputCard and "abilities" in englishCard:
 				for abilityIndex in range(min(len(outputCard["abilities"]), len(englishCard["abilities"]))):
 					if outputCard["abilities"][abilityIndex]["type"] != englishCard["abilities"][abilityIndex]["type"]:
 						cardDifferencesCount += 1
-						print(f"{cardId}: Ability index {abilityIndex} type mismatch, {GlobalConfig.language.englishName} type is '{outputCard['abilities'][abilityIndex]['type']}', English type is '{englishCard['abilities'][abilityIndex]['type']}'")
+						messages.append(f"{cardId}: Ability index {abilityIndex} type mismatch, {languageName} type is '{outputCard['abilities'][abilityIndex]['type']}', English type is '{englishCard['abilities'][abilityIndex]['type']}'")
 			# Compare rarities
-			if currentLanguageRarities.index(outputCard["rarity"]) != englishRarities.index(englishCard["rarity"]):
+			currentLanguageRarityIndex = currentLanguageRarityToIndex[outputCard["rarity"]]
+			if currentLanguageRarityIndex != englishRarityToIndex[englishCard["rarity"]]:
 				cardDifferencesCount += 1
-				print(f"{cardId}: {GlobalConfig.language.englishName} rarity is {englishRarities[currentLanguageRarities.index(outputCard['rarity'])]} ({outputCard['rarity']}) but English rarity is {englishCard['rarity']}")
-
-	print(f"----------\nFound {cardDifferencesCount:,} difference{'' if cardDifferencesCount == 1 else 's'} between input and output")
-
-def _printDifferencesDescription(outputCard: Dict, fieldName: str, inputString: str, outputString: str):
-	maxCharIndex = max(len(inputString), len(outputString))
-	fieldDifferencesPointers = [" " for _ in range(maxCharIndex)]
-	fieldDifferencesCount = 0
-	for charIndex in range(maxCharIndex):
-		if len(inputString) <= charIndex or len(outputString) <= charIndex or inputString[charIndex] != outputString[charIndex]:
-			fieldDifferencesPointers[charIndex] = "^"
-			fieldDifferencesCount += 1
-	print(f"{outputCard['fullName']} (ID {outputCard['id']}, {outputCard['fullIdentifier']}), {fieldName}, {fieldDifferencesCount:,} difference{'' if fieldDifferencesCount == 1 else 's'}:\n"
-		  f"  IN:  {inputString!r}\n"
-		  f"  OUT: {outputString!r}\n"
-		  f"        {''.join(fieldDifferencesPointers).rstrip()}")
+				messages.append(f"{cardId}: {languageName} rarity is {englishRarities[currentLanguageRarityIndex]} ({outputCard['rarity']}) but English rarity is {englishCard['rarity']}")
+	return cardDifferencesCount, messages
+
+@functools.lru_cache(maxsize=2)
+def _loadEnglishOutputCardsById(englishOutputFilePath: str, modificationTime: float) -> Dict[int, Dict]:
+	"""
+	Load the English output file and organise it by card ID. When verifying multiple languages, this is needed for every language, so the result gets cached
+	:param englishOutputFilePath: The path to the English output file
+	:param modificationTime: The modification time of the English output file. This isn't used, but it's part of the cache key, so the file gets reloaded if it changed
+	:return: A dictionary with the card ID as key and the English output card as value
+	"""
+	return {englishCard["id"]: englishCard for englishCard in JsonUtil.loadJson(englishOutputFilePath)["cards"]}
+
+# Card texts are often the same between cards, for instance with reprints and Enchanted versions, so cache the normalized texts
+@functools.lru_cache(maxsize=4096)
+def _normalizeInputRulesText(rulesText: str, language: Language.Language) -> str:
+	"""
+	Normalize the rules text from the input file, so it's formatted the same as the output rules text normalized by '_normalizeOutputRulesText'
+	:param rulesText: The rules text from the input card
+	:param language: The language of the card
+	:return: The normalized rules text
+	"""
+	rulesText = rulesText.translate(_INPUT_RULES_TEXT_TRANSLATION)
+	rulesText = _CONTRACTION_APOSTROPHE_REGEX.sub("'", rulesText)
+	rulesText = rulesText.replace("\u00a0", " " if language == Language.FRENCH else "").replace("  ", " ")
+	rulesText = rulesText.replace(" \"", " “").replace("\" ", "” ")
+	# Sometimes there's no space between the previous ability text and the next label or ability, fix that
+	rulesText = _MISSING_SPACE_REGEX.sub(r"\1 \2", rulesText)
+	if language == Language.ENGLISH:
+		rulesText = rulesText.replace("teammates’ ", "teammates' ").replace("players’ ", "players' ")
+	elif language == Language.FRENCH:
+		# Exclamation marks etc. should be preceded by a space, and multiple periods should be an ellipsis
+		rulesText = _FRENCH_RULES_TEXT_PUNCTUATION_REGEX.sub(_fixFrenchRulesTextPunctuation, rulesText)
+	return rulesText
+
+@functools.lru_cache(maxsize=4096)
+def _normalizeOutputRulesText(fullText: str) -> str:
+	"""
+	Normalize the full text from the output file, so it can be compared with the input rules text
+	:param fullText: The full text from the output card
+	:return: The normalized full text, with newlines and symbols removed
+	"""
+	fullText = _OUTPUT_RULES_TEXT_NEWLINE_REGEX.sub(_replaceNewline, fullText)
+	# Remove all the Lorcana symbols:
+	fullText = fullText.replace(f"{LorcanaSymbols.EXERT},", ",")
+	fullText = LorcanaSymbols.SYMBOL_STRIP_REGEX.sub(" ", fullText).lstrip()
+	return fullText.replace("  ", " ").replace(" .", ".")
+
+@functools.lru_cache(maxsize=4096)
+def _normalizeInputFlavorText(flavorText: str, language: Language.Language) -> str:
+	"""
+	Normalize the flavor text from the input file, so it's formatted the same as the output flavor text normalized by '_normalizeOutputFlavorText'
+	:param flavorText: The flavor text from the input card
+	:param language: The language of the card
+	:return: The normalized flavor text
+	"""
+	flavorText = flavorText.translate(_INPUT_FLAVOR_TEXT_TRANSLATION).rstrip()
+	# '%' seems to be a substitute for a newline character
+	flavorText = _PERCENTAGE_NEWLINE_REGEX.sub(" ", flavorText)
+	flavorText = flavorText.replace("  ", " ")
+	if flavorText.endswith(" ERRATA"):
+		flavorText = flavorText.rsplit(" ", 1)[0]
+	if language == Language.FRENCH:
+		flavorText = _FRENCH_PUNCTUATION_REGEX.sub(r" \1", flavorText)
+	return flavorText
+
+@functools.lru_cache(maxsize=4096)
+def _normalizeOutputFlavorText(flavorText: str) -> str:
+	"""
+	Normalize the flavor text from the output file, so it can be compared with the input flavor text
+	:param flavorText: The flavor text from the output card
+	:return: The normalized flavor text
+	"""
+	flavorText = flavorText.translate(_OUTPUT_FLAVOR_TEXT_TRANSLATION)
+	# Newlines are spaces in the input text, except after connecting dashes just before a newline
+	return _OUTPUT_FLAVOR_TEXT_NEWLINE_REGEX.sub(_replaceNewline, flavorText)
+
+def _fixFrenchRulesTextPunctuation(punctuationMatch: re.Match) -> str:
+	if punctuationMatch.group(1):
+		# Exclamation marks etc. should be preceded by a space
+		return " " + punctuationMatch.group(1)
+	return "…"
+
+def _replaceNewline(newlineMatch: re.Match) -> str:
+	return _NEWLINE_REPLACEMENTS[newlineMatch.group(0)]
+
+def _getCommonPrefixLength(firstString: str, secondString: str) -> int:
+	"""
+	Get the length of the start that both provided strings have in common
+	This does a binary search using string comparisons, which is a lot faster than comparing the strings character by character in Python
+	:param firstString: The first string to compare
+	:param secondString: The second string to compare
+	:return: The number of characters at the start of both strings that are the same
+	"""
+	lowerBound = 0
+	upperBound = min(len(firstString), len(secondString))
+	while lowerBound < upperBound:
+		middle = (lowerBound + upperBound + 1) // 2
+		if firstString.startswith(secondString[:middle]):
+			lowerBound = middle
+		else:
+			upperBound = middle - 1
+	return lowerBound
+
+def _createDifferencesDescription(outputCard: Dict, fieldName: str, inputString: str, outputString: str) -> str:
+	# Differences are often near the end of a text, so don't compare the start that's the same in both strings character by character
+	commonPrefixLength = _getCommonPrefixLength(inputString, outputString)
+	# Compare the rest of the strings character by character in one pass with 'map', which avoids running Python code for each character
+	# This results in a 0 byte for each equal character pair and a 1 byte for each different pair, which can then be counted and turned into the pointer string without creating a string for each character
+	differenceFlags = bytes(map(operator.ne, inputString[commonPrefixLength:], outputString[commonPrefixLength:]))
+	# Characters beyond the end of the shorter string always count as different
+	lengthDifference = abs(len(inputString) - len(outputString))
+	fieldDifferencesCount = differenceFlags.count(1) + lengthDifference
+	fieldDifferencesPointers = " " * commonPrefixLength + differenceFlags.translate(_DIFFERENCE_POINTERS_TABLE).decode("ascii") + "^" * lengthDifference
+	return (f"{outputCard['fullName']} (ID {outputCard['id']}, {outputCard['fullIdentifier']}), {fieldName}, {fieldDifferencesCount:,} difference{'' if fieldDifferencesCount == 1 else 's'}:\n"
+			f"  IN:  {inputString!r}\n"
+			f"  OUT: {outputString!r}\n"
+			f"        {fieldDifferencesPointers.rstrip()}")
@@ -1,5 +1,5 @@
-import logging
-from typing import Dict
+import logging, multiprocessing.pool
+from typing import Dict, List, Optional
 
 import requests
 
@@ -7,6 +7,12 @@ _logger = logging.getLogger("LorcanaJSON")
 UNITY_VERSION = "2022.3.44f1"
 DEFAULT_HEADERS = {"user-agent": "Lorcana/2024.4", "x-unity-version": UNITY_VERSION}
 
+# Use a single session for all downloads, so connections to the same server get reused instead of having to set up a new connection (and do a new TLS handshake) for each download
+_session = requests.Session()
+_session.headers.update(DEFAULT_HEADERS)
+# By default a session only keeps a few connections per server, allow more so concurrent downloads can also reuse their connections
+_session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
 
 class DownloadException(BaseException):
 	pass
@@ -21,15 +27,12 @@ def retrieveFromUrl(url: str, maxAttempts: int = 5, additionalHeaderFields: Dict
 	:return: The Requests request with the data from the provided URL
 	:raises DowloadException: Raised if the retrieval failed even after several attempts
 	"""
-	headers = DEFAULT_HEADERS
-	if additionalHeaderFields:
-		headers = DEFAULT_HEADERS.copy()
-		headers.update(additionalHeaderFields)
 	request = None
 	lastRequestThrewException: bool = False
 	for attempt in range(1, maxAttempts + 1):
 		try:
-			request = requests.get(url, headers=headers, timeout=10)
+			# The session already sends the default headers, and it adds the provided additional header fields to those
+			request = _session.get(url, headers=additionalHeaderFields, timeout=10)
 			lastRequestThrewException = False
 			if request.status_code == 200:
 				_logger.debug(f"Retrieval of '{url}' succeeded on attempt {attempt}")
@@ -41,3 +44,24 @@ def retrieveFromUrl(url: str, maxAttempts: int = 5, additionalHeaderFields: Dict
 			_logger.debug(f"Retrieval of '{url}' timed out on attempt {attempt}")
 			lastRequestThrewException = True
 	raise DownloadException(f"Download of '{url}' failed after {maxAttempts:,} attempts ({lastRequestThrewException=}, last attempt's status code: {request.status_code if request else 'missing'}")
+
+def retrieveFromUrls(urls: List[str], maxAttempts: int = 5, additionalHeaderFields: Dict[str, str] = None, threadCount: int = 8) -> List[Optional[requests.Response]]:
+	"""
+	Download multiple URLs at the same time. Most of the time of a download is spent waiting on the server, so doing them concurrently is a lot faster than one after the other
+	:param urls: The URLs to retrieve
+	:param maxAttempts: How many times to try to download each URL
+	:param additionalHeaderFields: Optional extra header fields to pass along with each call, on top of the default header fields
+	:param threadCount: The maximum number of downloads to do at the same time
+	:return: A list with the Requests response for each provided URL, in the same order as the provided URLs. If a URL couldn't be retrieved, its entry is None
+	"""
+	def retrieveOrNone(url: str) -> Optional[requests.Response]:
+		try:
+			return retrieveFromUrl(url, maxAttempts, additionalHeaderFields)
+		except DownloadException as e:
+			_logger.debug(f"Retrieval of '{url}' failed: {e}")
+			return None
+
+	if not urls:
+		return []
+	with multiprocessing.pool.ThreadPool(min(threadCount, len(urls))) as pool:
+		return pool.map(retrieveOrNone, urls)
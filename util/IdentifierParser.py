@@ -4,6 +4,9 @@ from typing import Union
 
 from util import LorcanaSymbols
 
+# Most identifiers are either the space-separated ones from the input data or correctly parsed ones from card images, so first try this simpler regex that only matches those,
+#  and only use the full regex, which also handles common parsing mistakes, if this doesn't match
+_CORRECT_IDENTIFIER_REGEX = re.compile(fr"^(?P<number>[0-9]+)(?P<variant>[a-z])?/(?P<grouping>[A-Z]?\d+)(?: {LorcanaSymbols.SEPARATOR} | )(?P<language>\w+)(?: {LorcanaSymbols.SEPARATOR} | )(?P<setCode>\S+)$")
 _IDENTIFIER_REGEX = re.compile(r"^(?P<number>[0-9V]+)(?P<variant>[a-z])?[/1](?P<grouping>[A-Z]?\d+)( ?[-+<]{1,2} ?| (. )?)(?P<language>\w+)( ?[-+<]{1,2} ?| (. )?)(?P<setCode>\S+)$")
 _LOGGER = logging.getLogger("LorcanaJSON")
 
@@ -47,7 +50,7 @@ def parseIdentifier(identifierString: str) -> Union[None, Identifier]:
 	:param identifierString: The identifier string to parse
 	:return: A parsed Identifier instance, or None if the identifier string couldn't be parsed
 	"""
-	parsedIdentifier = _IDENTIFIER_REGEX.match(identifierString)
+	parsedIdentifier = _CORRECT_IDENTIFIER_REGEX.match(identifierString) or _IDENTIFIER_REGEX.match(identifierString)
 	if not parsedIdentifier:
 		_LOGGER.warning(f"Unable to parse identifier {identifierString}")
 		return None
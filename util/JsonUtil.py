@@ -0,0 +1,57 @@
+import json
+from typing import Any, Dict, Iterator
+
+try:
+	import orjson
+except ImportError:
+	# orjson is an optional library, loading is a bit slower without it but works just the same
+	orjson = None
+try:
+	import ijson
+except ImportError:
+	# ijson is also optional, without it card store files get loaded fully instead of streamed
+	ijson = None
+
+
+def loadJson(pathToJson: str) -> Any:
+	"""
+	Load the JSON file at the provided path. This uses the 'orjson' library if it's installed, since that's a lot faster for the large card data files, and the built-in 'json' module otherwise
+	:param pathToJson: The path to the JSON file to load
+	:return: The parsed JSON data
+	"""
+	with open(pathToJson, "rb") as jsonFile:
+		if orjson:
+			return orjson.loads(jsonFile.read())
+		return json.load(jsonFile)
+
+def iterateCardStoreCards(pathToCardStore: str) -> Iterator[Dict]:
+	"""
+	Go through all the cards in a card store file as downloaded from the official app, regardless of their card type
+	If the 'ijson' library is installed, the file gets streamed, so only the cards of one card type are in memory at a time instead of the whole file
+	:param pathToCardStore: The path to the card store file
+	:return: An iterator that returns each card in the card store
+	"""
+	if ijson:
+		with open(pathToCardStore, "rb") as cardStoreFile:
+			for cardType, cardList in ijson.kvitems(cardStoreFile, "cards", use_float=True):
+				yield from cardList
+	else:
+		for cardList in loadJson(pathToCardStore)["cards"].values():
+			yield from cardList
+
+def loadJsonWithNumberKeys(pathToJson: str) -> Dict[int, Any]:
+	"""
+	Load the JSON file at the provided path, and convert all its top-level keys to numbers, since JSON only supports string keys. Useful for files where the keys are card IDs
+	:param pathToJson: The path to the JSON file to load. The top level of the file should be a dictionary with only numeric keys
+	:return: The parsed JSON data, with the top-level keys converted to numbers
+	"""
+	return convertStringKeysToNumberKeys(loadJson(pathToJson))
+
+def convertStringKeysToNumberKeys(inputDict: Dict[str, Any]) -> Dict[int, Any]:
+	"""
+	Convert the keys of the provided dictionary from strings to numbers. This creates a new dictionary, the input dictionary isn't changed
+	:param inputDict: The dictionary with numeric string keys to convert
+	:return: A new dictionary with the same values, but with the keys converted to numbers
+	"""
+	# Convert the keys in one pass instead of through a Python-level dict comprehension
+	return dict(zip(map(int, inputDict), inputDict.values()))
@@ -1,5 +1,6 @@
+import functools, sys
 from collections import namedtuple
-from typing import Tuple
+from typing import Dict, Tuple
 
 
 Language = namedtuple("Language", ("code", "threeLetterCode", "englishName", "nativeName"))
@@ -10,10 +11,14 @@ GERMAN = Language("de", "deu", "German", "Deutsch")
 ITALIAN = Language("it", "ita", "Italian", "Italiano")
 
 ALL: Tuple[Language, ...] = (ENGLISH, FRENCH, GERMAN, ITALIAN)
+# Both the two-letter and three-letter codes map to their language, so a language can be looked up directly by either code
+BY_CODE: Dict[str, Language] = {**{language.code: language for language in ALL}, **{language.threeLetterCode: language for language in ALL}}
 
+@functools.lru_cache(maxsize=16)
 def getLanguageByCode(languageCode: str) -> Language:
-	languageCode = languageCode.lower()
-	for language in ALL:
-		if language.code == languageCode or language.threeLetterCode == languageCode:
-			return language
-	raise ValueError(f"Invalid language code '{languageCode}'")
+	# The codes in BY_CODE are literals and thus already interned, intern the lowercased input too so the dict lookup can match on identity
+	languageCode = sys.intern(languageCode.lower())
+	try:
+		return BY_CODE[languageCode]
+	except KeyError:
+		raise ValueError(f"Invalid language code '{languageCode}'")
@@ -1,3 +1,6 @@
+import re
+
+
 EXERT = "⟳"  # Unicode \u27F3   HTML entities &#10227;  &#x27F3;
 INK = "⬡"  # Unicode \u2B21  HTML entities &#11041;  &#x2B21;
 LORE = "◊"  # Unicode \u25CA  HTML entities &#9674;  &#x25CA;  &loz;
@@ -7,3 +10,6 @@ STRENGTH = "¤"  # Unicode \u00A4  HTML entities &#164;  &#xA4;  &curren;
 WILLPOWER = "⛉"  # Unicode \u26C9  HTML entities: &#9929;  &#x26C9;
 INKWELL = "◉"  # Unicode \u25C9 Not entirely accurate to the actual symbol (See card ID 789), but the closest I could find in Unicode
 SEPARATOR = "•"  # Unicode \u2022 HTML entities &#8226; &bull;
+
+# Matches one of the symbols used in card texts, including a single space on either side of it, so the symbols can be stripped from a text
+SYMBOL_STRIP_REGEX = re.compile(f" ?[{EXERT}{INK}{LORE}{STRENGTH}{WILLPOWER}{INKWELL}] ?")
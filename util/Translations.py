@@ -1,3 +1,4 @@
+import dataclasses
 from dataclasses import dataclass
 
 from util import Language
@@ -30,9 +31,13 @@ class Translation:
 	quest: str
 	starter: str
 
+	def __post_init__(self):
+		# Store the fields in a dictionary too, so item subscription is a simple dictionary lookup. The class is frozen, so the attribute has to be set through 'object'
+		object.__setattr__(self, "_fieldsByName", {field.name: getattr(self, field.name) for field in dataclasses.fields(self)})
+
 	def __getitem__(self, item) -> str:
 		# This allows the use of item subscription (myTranslation['AMBER'] or myTranslation[card[color]])
-		return self.__getattribute__(item)
+		return self._fieldsByName[item]
 
 
 # An English translation doesn't make much sense, but it saves a lot of if language == ENGLISH or translation == ..." checks
@@ -149,8 +154,10 @@ ITALIAN = Translation(
 	starter="Mazzi per giocatore singolo"
 )
 
+_TRANSLATIONS_BY_LANGUAGE = {translation.language: translation for translation in (ENGLISH, FRENCH, GERMAN, ITALIAN)}
+
 def getForLanguage(language: Language.Language):
-	for translation in (ENGLISH, FRENCH, GERMAN, ITALIAN):
-		if translation.language == language:
-			return translation
-	raise ValueError(f"No translation found for language {language}")
+	try:
+		return _TRANSLATIONS_BY_LANGUAGE[language]
+	except KeyError:
+		raise ValueError(f"No translation found for language {language}")